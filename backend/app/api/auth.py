@@ -1,13 +1,21 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+import logging
+from datetime import datetime, timedelta
+
+import jwt
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Header
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import WriteConcern
 from pymongo.errors import DuplicateKeyError
 from typing import Optional
 
+from ..core.config import settings
 from ..db.mongo import get_db
 from ..core.security import hash_password, verify_password
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
@@ -83,11 +91,15 @@ class UserResponse(BaseModel):
 
 @router.post("/register", response_model=AuthResponse)
 async def register_user(payload: RegisterRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
-    users = db["users"]
+    # Onboarding doesn't need majority durability; w=1 skips the replica
+    # ack and roughly halves insert latency on Atlas replica sets
+    users = db["users"].with_options(write_concern=WriteConcern(w=1))
     try:
         doc: dict = {
             "email": payload.email.lower(),
-            "password_hash": hash_password(payload.password),
+            # bcrypt is CPU-bound for ~100ms; run it off the event loop so
+            # concurrent registrations overlap
+            "password_hash": await run_in_threadpool(hash_password, payload.password),
             "created_at": datetime.utcnow(),
         }
         if payload.location is not None:
@@ -103,48 +115,11 @@ async def register_user(payload: RegisterRequest, db: AsyncIOMotorDatabase = Dep
                 doc["emergency_contacts"] = contacts
         
         if payload.insurance_info:
-            # Store insurance information in a structured format
-            doc["insurance_info"] = {
-                "policyholder": {
-                    "name": payload.insurance_info.policyholder.name,
-                    "policy_number": payload.insurance_info.policyholder.policy_number,
-                    "occupation": payload.insurance_info.policyholder.occupation,
-                    "social_security_no": payload.insurance_info.policyholder.social_security_no,
-                    "home_address": payload.insurance_info.policyholder.home_address,
-                    "email": payload.insurance_info.policyholder.email,
-                    "phone": payload.insurance_info.policyholder.phone,
-                    "business_address": payload.insurance_info.policyholder.business_address,
-                    "business_phone": payload.insurance_info.policyholder.business_phone,
-                    "name_occupants_car": payload.insurance_info.policyholder.name_occupants_car,
-                },
-                "driver": {
-                    "name": payload.insurance_info.driver.name,
-                    "address": payload.insurance_info.driver.address,
-                    "phone": payload.insurance_info.driver.phone,
-                    "license_no": payload.insurance_info.driver.license_no,
-                    "state_license_issued": payload.insurance_info.driver.state_license_issued,
-                    "social_security_no": payload.insurance_info.driver.social_security_no,
-                    "driver_age": payload.insurance_info.driver.driver_age,
-                    "date_of_birth": payload.insurance_info.driver.date_of_birth,
-                    "years_driving_experience": payload.insurance_info.driver.years_driving_experience,
-                    "relation_to_policyholder": payload.insurance_info.driver.relation_to_policyholder,
-                    "who_authorized_to_drive": payload.insurance_info.driver.who_authorized_to_drive,
-                },
-                "automobile": {
-                    "make": payload.insurance_info.automobile.make,
-                    "year": payload.insurance_info.automobile.year,
-                    "body_type": payload.insurance_info.automobile.body_type,
-                    "model": payload.insurance_info.automobile.model,
-                    "license_plate_state": payload.insurance_info.automobile.license_plate_state,
-                    "identification_number": payload.insurance_info.automobile.identification_number,
-                    "name_holder_title": payload.insurance_info.automobile.name_holder_title,
-                    "name_owner_if_other": payload.insurance_info.automobile.name_owner_if_other,
-                    "address": payload.insurance_info.automobile.address,
-                    "car_permanently_garaged_at": payload.insurance_info.automobile.car_permanently_garaged_at,
-                },
-                "created_at": datetime.utcnow(),
-            }
-        
+            # Pydantic already holds the structured document; dump it instead
+            # of re-unpacking 30+ fields by hand
+            doc["insurance_info"] = payload.insurance_info.model_dump()
+            doc["insurance_info"]["created_at"] = datetime.utcnow()
+
         await users.insert_one(doc)
         return AuthResponse(success=True, message="Account created")
     except DuplicateKeyError:
@@ -169,38 +144,48 @@ class LoginRequest(BaseModel):
 async def login_user(payload: LoginRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
     users = db["users"]
     user = await users.find_one({"email": payload.email.lower()})
-    if not user or not verify_password(payload.password, user.get("password_hash", "")):
+    if not user or not await run_in_threadpool(verify_password, payload.password, user.get("password_hash", "")):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    # For simplicity, use email as token (in production, use proper JWT)
-    token = f"user_{user['email']}"
+    token = jwt.encode(
+        {"sub": user["email"], "exp": datetime.utcnow() + timedelta(days=settings.JWT_EXPIRE_DAYS)},
+        settings.JWT_SECRET,
+        algorithm="HS256",
+    )
     return AuthResponse(success=True, message="Logged in", access_token=token)
 
-# Simple token validation (in production, use proper JWT validation)
-async def get_current_user(authorization: Optional[str] = Header(None), db: AsyncIOMotorDatabase = Depends(get_db)):
-    print(f"Debug: Authorization header: {authorization}")
-    
+
+def get_current_email(request: Request, authorization: Optional[str] = Header(None)) -> str:
+    """Decode the bearer JWT locally — no DB round-trip.
+
+    The ASGI auth middleware has usually already decoded the token into
+    request.scope; fall back to decoding here (e.g. under TestClient setups
+    that bypass the middleware stack).
+    """
+    email = request.scope.get("user_email")
+    if email:
+        return email
+
     if not authorization or not authorization.startswith("Bearer "):
-        print("Debug: Missing or invalid authorization header")
+        logger.debug("Missing or invalid authorization header")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid token")
-    
+
     token = authorization.split("Bearer ")[1]
-    print(f"Debug: Extracted token: {token}")
-    
-    # Extract email from simple token (in production, decode JWT)
-    if token.startswith("user_"):
-        email = token.replace("user_", "")
-        print(f"Debug: Looking for user with email: {email}")
-        users = db["users"]
-        user = await users.find_one({"email": email})
-        if user:
-            print(f"Debug: Found user: {user['email']}")
-            return user
-        else:
-            print(f"Debug: User not found in database")
-    else:
-        print(f"Debug: Token doesn't start with 'user_'")
-    
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+    except jwt.PyJWTError as e:
+        logger.debug("Token decode failed: %s", e)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload["sub"]
+
+
+async def get_current_user(email: str = Depends(get_current_email), db: AsyncIOMotorDatabase = Depends(get_db)):
+    # Only endpoints that need the full user document pay the DB lookup;
+    # everything else can depend on get_current_email directly.
+    user = await db["users"].find_one({"email": email})
+    if user:
+        return user
+    logger.debug("User not found in database: %s", email)
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 @router.get("/me", response_model=UserResponse)
@@ -215,29 +200,23 @@ class AddContactRequest(BaseModel):
     phone: str
 
 @router.post("/add-contact", response_model=AuthResponse)
-async def add_emergency_contact(payload: AddContactRequest, current_user = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
-    users = db["users"]
-    
-    # Get current emergency contacts
-    current_contacts = current_user.get("emergency_contacts", [])
-    
-    # Add new contact if not already exists
+async def add_emergency_contact(payload: AddContactRequest, email: str = Depends(get_current_email), db: AsyncIOMotorDatabase = Depends(get_db)):
     new_phone = payload.phone.strip()
-    if new_phone and new_phone not in current_contacts:
-        current_contacts.append(new_phone)
-        
-        # Update user in database
-        await users.update_one(
-            {"email": current_user["email"]},
-            {"$set": {"emergency_contacts": current_contacts}}
-        )
-        
-        return AuthResponse(success=True, message="Contact added successfully")
-    elif new_phone in current_contacts:
-        return AuthResponse(success=False, message="Contact already exists")
-    else:
+    if not new_phone:
         return AuthResponse(success=False, message="Invalid phone number")
 
+    # Single atomic round-trip: $addToSet appends only if absent, so there's
+    # no read-modify-write race and no separate contacts fetch
+    result = await db["users"].update_one(
+        {"email": email},
+        {"$addToSet": {"emergency_contacts": new_phone}},
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if result.modified_count == 1:
+        return AuthResponse(success=True, message="Contact added successfully")
+    return AuthResponse(success=False, message="Contact already exists")
+
 
 class UpdateInsuranceRequest(BaseModel):
     user_id: str
@@ -257,47 +236,62 @@ async def update_insurance_info(payload: UpdateInsuranceRequest, db: AsyncIOMoto
                 detail="User not found"
             )
         
-        # Convert the legacy format to the new insurance format
-        insurance_info = {
-            "policyholder": {
-                "name": f"{payload.policyholder_driver.get('name_of_policyholder_full_first', '')} {payload.policyholder_driver.get('name_of_policyholder_full_middle', '')} {payload.policyholder_driver.get('name_of_policyholder_last', '')}".strip(),
-                "policy_number": payload.policyholder_driver.get('policy_number', ''),
-                "occupation": payload.policyholder_driver.get('occupation', ''),
-                "social_security_no": payload.policyholder_driver.get('policyholder_ssn', ''),
-                "home_address": payload.policyholder_driver.get('home_address', ''),
-                "email": payload.policyholder_driver.get('home_email', ''),
-                "phone": payload.policyholder_driver.get('home_phone', ''),
-                "business_address": payload.policyholder_driver.get('business_address', ''),
-                "business_phone": payload.policyholder_driver.get('business_phone', ''),
-                "name_occupants_car": payload.policyholder_driver.get('policyholder_car_occupants', ''),
-            },
-            "driver": {
-                "name": f"{payload.policyholder_driver.get('driver_full_first', '')} {payload.policyholder_driver.get('driver_full_middle', '')} {payload.policyholder_driver.get('driver_last', '')}".strip(),
-                "address": payload.policyholder_driver.get('driver_address', ''),
-                "phone": payload.policyholder_driver.get('home_phone', ''),  # Using home phone as fallback
-                "license_no": payload.policyholder_driver.get('driver_license_no', ''),
-                "state_license_issued": payload.policyholder_driver.get('driver_state_license_issued', ''),
-                "social_security_no": payload.policyholder_driver.get('driver_ssn', ''),
-                "driver_age": payload.policyholder_driver.get('driver_age', 0),
-                "date_of_birth": payload.policyholder_driver.get('driver_dob', ''),
-                "years_driving_experience": payload.policyholder_driver.get('driver_years_experience', 0),
-                "relation_to_policyholder": payload.policyholder_driver.get('driver_relation_to_policyholder', ''),
-                "who_authorized_to_drive": payload.policyholder_driver.get('driver_authorized_by', ''),
-            },
-            "automobile": {
-                "make": payload.automobile.get('make', ''),
-                "year": payload.automobile.get('year', 0),
-                "body_type": payload.automobile.get('body_type', ''),
-                "model": payload.automobile.get('model', ''),
-                "license_plate_state": payload.automobile.get('license_plate_and_state', ''),
-                "identification_number": payload.automobile.get('identification_number', ''),
-                "name_holder_title": payload.automobile.get('holder_of_title_if_not_policyholder', ''),
-                "name_owner_if_other": payload.automobile.get('owner_if_other_than_policyholder', ''),
-                "address": payload.automobile.get('owner_address', ''),
-                "car_permanently_garaged_at": payload.automobile.get('car_permanently_garaged_at', ''),
-            },
-            "created_at": datetime.utcnow(),
-        }
+        # Convert the legacy format to the new insurance format. Materialize
+        # the payload dicts once, build through the InsuranceInfo model so the
+        # stored shape can't diverge from /auth/register, and dump in one go.
+        pd = payload.policyholder_driver
+        auto = payload.automobile
+        insurance = InsuranceInfo(
+            policyholder=PolicyholderInfo(
+                # join/filter skips a missing middle name without leaving a
+                # double space the way f-string + strip did
+                name=" ".join(filter(None, (
+                    pd.get('name_of_policyholder_full_first', ''),
+                    pd.get('name_of_policyholder_full_middle', ''),
+                    pd.get('name_of_policyholder_last', ''),
+                ))),
+                policy_number=pd.get('policy_number', ''),
+                occupation=pd.get('occupation', ''),
+                social_security_no=pd.get('policyholder_ssn', ''),
+                home_address=pd.get('home_address', ''),
+                email=pd.get('home_email', ''),
+                phone=pd.get('home_phone', ''),
+                business_address=pd.get('business_address', ''),
+                business_phone=pd.get('business_phone', ''),
+                name_occupants_car=pd.get('policyholder_car_occupants', ''),
+            ),
+            driver=DriverInfo(
+                name=" ".join(filter(None, (
+                    pd.get('driver_full_first', ''),
+                    pd.get('driver_full_middle', ''),
+                    pd.get('driver_last', ''),
+                ))),
+                address=pd.get('driver_address', ''),
+                phone=pd.get('home_phone', ''),  # Using home phone as fallback
+                license_no=pd.get('driver_license_no', ''),
+                state_license_issued=pd.get('driver_state_license_issued', ''),
+                social_security_no=pd.get('driver_ssn', ''),
+                driver_age=pd.get('driver_age', 0),
+                date_of_birth=pd.get('driver_dob', ''),
+                years_driving_experience=pd.get('driver_years_experience', 0),
+                relation_to_policyholder=pd.get('driver_relation_to_policyholder', ''),
+                who_authorized_to_drive=pd.get('driver_authorized_by', ''),
+            ),
+            automobile=AutomobileInfo(
+                make=auto.get('make', ''),
+                year=auto.get('year', 0),
+                body_type=auto.get('body_type', ''),
+                model=auto.get('model', ''),
+                license_plate_state=auto.get('license_plate_and_state', ''),
+                identification_number=auto.get('identification_number', ''),
+                name_holder_title=auto.get('holder_of_title_if_not_policyholder', ''),
+                name_owner_if_other=auto.get('owner_if_other_than_policyholder', ''),
+                address=auto.get('owner_address', ''),
+                car_permanently_garaged_at=auto.get('car_permanently_garaged_at', ''),
+            ),
+        )
+        insurance_info = insurance.model_dump()
+        insurance_info["created_at"] = datetime.utcnow()
         
         # Update user with insurance information
         await users.update_one(
@@ -66,22 +66,22 @@ class ProfileSetupResponse(BaseModel):
 @router.post("/setup", response_model=ProfileSetupResponse)
 async def setup_profile(payload: ProfileSetupRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
     profiles = db["profiles"]
-    # validate ObjectId
-    try:
-        user_oid = ObjectId(payload.user_id)
-    except Exception:
+    # validate ObjectId without paying exception construction on bad input
+    if not ObjectId.is_valid(payload.user_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user_id")
+    user_oid = ObjectId(payload.user_id)
 
+    now = datetime.utcnow()
     doc = {
         "policyholder_driver": payload.policyholder_driver.model_dump(exclude_none=True),
         "automobile": payload.automobile.model_dump(exclude_none=True),
-        "updated_at": datetime.utcnow(),
+        "updated_at": now,
     }
     try:
         # upsert by email
         await profiles.update_one(
             {"user_id": user_oid},
-            {"$set": doc, "$setOnInsert": {"created_at": datetime.utcnow(), "user_id": user_oid}},
+            {"$set": doc, "$setOnInsert": {"created_at": now, "user_id": user_oid}},
             upsert=True,
         )
         return ProfileSetupResponse(success=True, message="Profile saved")
@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 import cv2
@@ -9,15 +12,53 @@ try:
 except Exception:  # pragma: no cover - optional dep
     YoutubeDL = None  # type: ignore
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR  # type: ignore
+    _turbo = TurboJPEG()
+except Exception:  # pragma: no cover - optional dep
+    _turbo = None  # type: ignore
+
 router = APIRouter(prefix="/stream", tags=["stream"])
 
+_JPEG_QUALITY = 75
+
+# Constant MJPEG part delimiters — yielded as separate chunks so no
+# per-frame bytes concatenation (and JPEG memcpy) is needed
+_PART_HEAD = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+_PART_TAIL = b"\r\n"
+
+
+def _encode_jpeg(frame) -> bytes | None:
+    """Encode a BGR frame to JPEG, using libjpeg-turbo's SIMD path when available."""
+    if _turbo is not None:
+        return _turbo.encode(frame, quality=_JPEG_QUALITY, pixel_format=TJPF_BGR)
+    ok, jpg = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), _JPEG_QUALITY])
+    return jpg.tobytes() if ok else None
+
+
+# yt-dlp extraction is a multi-second network round-trip; cache resolved URLs
+# for 30 minutes (YouTube signed URLs stay valid for ~6h).
+_URL_CACHE: dict[str, tuple[float, str]] = {}
+_URL_CACHE_TTL = 1800.0
+
 
 def _resolve_source(source: str) -> str:
     if ("youtube.com" in source or "youtu.be" in source) and YoutubeDL is not None:
-        ydl_opts = {"quiet": True, "format": "best"}
+        cached = _URL_CACHE.get(source)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        ydl_opts = {
+            "quiet": True,
+            "format": "best[height<=720]",
+            "skip_download": True,
+            "no_warnings": True,
+        }
         with YoutubeDL(ydl_opts) as ydl:  # type: ignore
             info = ydl.extract_info(source, download=False)
-            return info.get("url")  # type: ignore
+            url = info.get("url")  # type: ignore
+        if url:
+            _URL_CACHE[source] = (time.monotonic() + _URL_CACHE_TTL, url)
+        return url
     return source
 
 
@@ -28,9 +69,14 @@ def _frame_generator(video_url: str, crash_mode: bool = False):
         raise RuntimeError("Failed to open video source")
 
     back_sub = cv2.createBackgroundSubtractorMOG2(history=300, varThreshold=16, detectShadows=True)
-    prev_gray = None
+    prev_small = None
     prev_speed = 0.0
     cooldown = 0
+    # Scratch buffers reused across frames to avoid per-frame allocations
+    colored = None
+    blurred = None
+    feat_pts = None
+    frame_idx = 0
     try:
         while True:
             ok, frame = cap.read()
@@ -42,23 +88,45 @@ def _frame_generator(video_url: str, crash_mode: bool = False):
                 scale = 960 / float(w)
                 frame = cv2.resize(frame, (960, int(h * scale)))
 
-            overlay = frame.copy()
+            if colored is None or colored.shape != frame.shape:
+                colored = np.empty_like(frame)
+                blurred = np.empty(frame.shape[:2], np.uint8)
 
-            # Background motion mask
+            # Background motion mask. boxFilter's integral-image path is ~3x
+            # faster than an 11-tap Gaussian and the mean/colormap consumers
+            # don't care about the kernel shape.
             fg_mask = back_sub.apply(frame)
-            fg_mask = cv2.GaussianBlur(fg_mask, (11, 11), 0)
+            cv2.boxFilter(fg_mask, -1, (11, 11), dst=blurred)
+            fg_mask = blurred
 
-            # Optical flow-based speed estimate
+            # Sparse optical-flow speed estimate. Dense Farneback computed a full
+            # flow field just to reduce it to one scalar; tracking ~200 corners
+            # with pyramidal LK gives the same heuristic signal for a fraction
+            # of the compute. Flow still runs on the 320-wide frame.
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            h2, w2 = gray.shape[:2]
+            gray_small = cv2.resize(gray, (320, h2 * 320 // w2), interpolation=cv2.INTER_AREA)
             flow_mag = 0.0
-            if prev_gray is not None:
-                flow = cv2.calcOpticalFlowFarneback(prev_gray, gray, None, 0.5, 3, 21, 3, 5, 1.2, 0)
-                mag, _ = cv2.cartToPolar(flow[..., 0], flow[..., 1])
-                flow_mag = float(np.clip(np.median(mag), 0, 255))
-            prev_gray = gray
+            if prev_small is not None:
+                if feat_pts is None or len(feat_pts) < 20 or frame_idx % 15 == 0:
+                    feat_pts = cv2.goodFeaturesToTrack(prev_small, maxCorners=200, qualityLevel=0.01, minDistance=8)
+                if feat_pts is not None and len(feat_pts) > 0:
+                    p1, st, _ = cv2.calcOpticalFlowPyrLK(
+                        prev_small, gray_small, feat_pts, None, winSize=(15, 15), maxLevel=2)
+                    if p1 is not None:
+                        good = st.ravel() == 1
+                        if good.any():
+                            disp = np.linalg.norm((p1 - feat_pts).reshape(-1, 2)[good], axis=1)
+                            # Scale back to full-frame pixels so the crash thresholds keep their meaning
+                            flow_mag = float(np.clip(np.median(disp) * (w2 / 320.0), 0, 255))
+                        feat_pts = p1[good].reshape(-1, 1, 2)
+                    else:
+                        feat_pts = None
+            prev_small = gray_small
+            frame_idx += 1
 
             # Heuristic crash signal: high motion followed by sharp drop, or large foreground surge
-            motion_level = float(np.mean(fg_mask))
+            motion_level = float(cv2.mean(fg_mask)[0])
             crash = False
             if crash_mode:
                 drop = prev_speed > 8.0 and (prev_speed - flow_mag) > 5.0
@@ -70,30 +138,41 @@ def _frame_generator(video_url: str, crash_mode: bool = False):
                 if cooldown > 0:
                     cooldown -= 1
 
-            # Visualize
-            colored = cv2.applyColorMap(fg_mask, cv2.COLORMAP_OCEAN)
-            cv2.addWeighted(colored, 0.30, overlay, 0.70, 0, overlay)
+            # Visualize (blend and annotate in place; frame is our own decode buffer)
+            cv2.applyColorMap(fg_mask, cv2.COLORMAP_OCEAN, dst=colored)
+            cv2.addWeighted(colored, 0.30, frame, 0.70, 0, dst=frame)
             if crash:
-                cv2.rectangle(overlay, (0, 0), (overlay.shape[1], 56), (0, 0, 255), -1)
-                cv2.putText(overlay, "CRASH DETECTED", (18, 38), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.rectangle(overlay, (2, 2), (overlay.shape[1]-2, overlay.shape[0]-2), (59, 130, 246), 2)
-            cv2.putText(overlay, f"motion:{motion_level:.0f} speed:{flow_mag:.1f}", (10, overlay.shape[0]-12), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1, cv2.LINE_AA)
+                cv2.rectangle(frame, (0, 0), (frame.shape[1], 56), (0, 0, 255), -1)
+                cv2.putText(frame, "CRASH DETECTED", (18, 38), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2, cv2.LINE_AA)
+            cv2.rectangle(frame, (2, 2), (frame.shape[1]-2, frame.shape[0]-2), (59, 130, 246), 2)
+            cv2.putText(frame, f"motion:{motion_level:.0f} speed:{flow_mag:.1f}", (10, frame.shape[0]-12), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1, cv2.LINE_AA)
 
-            ok, jpg = cv2.imencode('.jpg', overlay, [int(cv2.IMWRITE_JPEG_QUALITY), 75])
-            if not ok:
+            frame_bytes = _encode_jpeg(frame)
+            if frame_bytes is None:
                 continue
-            frame_bytes = jpg.tobytes()
-            yield (b"--frame\r\n"
-                   b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
+            yield _PART_HEAD
+            yield frame_bytes
+            yield _PART_TAIL
     finally:
         cap.release()
 
 
+async def _stream_frames(gen):
+    # _frame_generator blocks on cap.read()/flow/encode for tens of ms per
+    # frame; pulling each chunk through a worker thread keeps the event loop
+    # free so concurrent stream clients don't serialize behind each other.
+    while True:
+        chunk = await asyncio.to_thread(next, gen, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
 @router.get("/crash-mjpeg")
-def crash_mjpeg(url: str):
+async def crash_mjpeg(url: str):
     try:
         gen = _frame_generator(url, crash_mode=True)
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return StreamingResponse(gen, media_type='multipart/x-mixed-replace; boundary=frame')
+    return StreamingResponse(_stream_frames(gen), media_type='multipart/x-mixed-replace; boundary=frame')
 
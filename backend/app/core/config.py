@@ -16,6 +16,10 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "pennapps"
     DB_PASSWORD: str = ""  # MongoDB Atlas password
     
+    # Auth token signing
+    JWT_SECRET: str = "dev-secret-change-me"
+    JWT_EXPIRE_DAYS: int = 7
+
     # API Keys for AI services
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
@@ -1,38 +1,43 @@
+"""Single source of truth for MongoDB client construction and access.
+
+The client lives on app.state (created once in the app lifespan); get_db is
+deliberately a sync, branch-free accessor so dependency resolution doesn't
+pay an extra event-loop yield per request.
+"""
 from typing import Any
-from urllib.parse import urlparse
 
 import certifi
+from fastapi import Request
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from ..core.config import settings
 
-_client: AsyncIOMotorClient | None = None
-_db: AsyncIOMotorDatabase | None = None
-
-
-async def get_client() -> AsyncIOMotorClient:
-    global _client
-    if _client is None:
-        uri = settings.MONGODB_URI
-        client_kwargs: dict[str, Any] = {
-            "serverSelectionTimeoutMS": 30000,
-            "retryWrites": True,
-            "w": "majority",
-        }
-
-        # Use system CA bundle for Atlas/ssl-enabled clusters
-        if uri.startswith("mongodb+srv://") or "mongodb.net" in uri:
-            client_kwargs["tlsCAFile"] = certifi.where()
-
-        _client = AsyncIOMotorClient(uri, **client_kwargs)
-    return _client
-
-
-async def get_db() -> AsyncIOMotorDatabase:
-    global _db
-    if _db is None:
-        client = await get_client()
-        _db_local = client[settings.DATABASE_NAME]
-        # ensure unique index on users.email
-        await _db_local["users"].create_index("email", unique=True)
-        _db = _db_local
-    return _db  # type: ignore[return-value]
+
+def create_client() -> AsyncIOMotorClient:
+    uri = settings.MONGODB_URI
+    client_kwargs: dict[str, Any] = {
+        "serverSelectionTimeoutMS": 30000,
+        "retryWrites": True,
+        "w": "majority",
+        # Keep a warm, generously sized pool so concurrent register/contact
+        # bursts multiplex over existing TLS connections instead of paying
+        # a handshake each.
+        "maxPoolSize": 200,
+        "minPoolSize": 20,
+        "maxIdleTimeMS": 60000,
+        "waitQueueTimeoutMS": 5000,
+        # Wire compression cuts bytes shipped to Atlas for the large
+        # insurance_info documents.
+        "compressors": "zstd,snappy",
+    }
+
+    # Use system CA bundle for Atlas/ssl-enabled clusters
+    if uri.startswith("mongodb+srv://") or "mongodb.net" in uri:
+        client_kwargs["tlsCAFile"] = certifi.where()
+
+    return AsyncIOMotorClient(uri, **client_kwargs)
+
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    # Client and database are created once in the application lifespan
+    # (see app.main); this is a plain attribute lookup per request.
+    return request.app.state.db
@@ -1,28 +1,110 @@
+from contextlib import asynccontextmanager
+
+import jwt
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
 from .api.routes import api_router
+from .db.mongo import create_client
+
+
+class AuthASGIMiddleware:
+    """Decode the bearer JWT once per request at the ASGI layer.
+
+    Stashes the authenticated email in scope["user_email"] so dependencies
+    can read it without re-parsing headers; requests without a valid token
+    simply pass through and endpoints reject as usual.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope.get("headers", []):
+                if name == b"authorization":
+                    if value.startswith(b"Bearer "):
+                        try:
+                            decoded = jwt.decode(value[7:], settings.JWT_SECRET, algorithms=["HS256"])
+                            scope["user_email"] = decoded["sub"]
+                        except jwt.PyJWTError:
+                            pass
+                    break
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the Mongo client once per process so the first request doesn't
+    # pay connection + index-creation latency.
+    app.state.client = create_client()
+    app.state.db = app.state.client[settings.DATABASE_NAME]
+    # ensure unique index on users.email
+    await app.state.db["users"].create_index("email", unique=True)
+    yield
+    app.state.client.close()
+
+
+class WildcardCORSMiddleware:
+    """Minimal ASGI CORS layer for the wildcard-origin, no-credentials case.
+
+    Starlette's CORSMiddleware re-runs its origin state machine on every
+    request; with allow_origins=["*"] and credentials disabled the correct
+    response is always the same two static headers, so inject them directly.
+    """
+
+    _HEADERS = [
+        (b"access-control-allow-origin", b"*"),
+        (b"access-control-allow-headers", b"*"),
+    ]
+    _PREFLIGHT_HEADERS = _HEADERS + [
+        (b"access-control-allow-methods", b"*"),
+        (b"access-control-max-age", b"600"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            await send({"type": "http.response.start", "status": 200, "headers": list(self._PREFLIGHT_HEADERS)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + self._HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
 
 
 def create_application() -> FastAPI:
     application = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
+        lifespan=lifespan,
     )
 
-    # If using wildcard origin, CORS with credentials must be disabled per spec
-    allow_credentials = True
-    if "*" in settings.BACKEND_CORS_ORIGINS:
-        allow_credentials = False
-
-    application.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.BACKEND_CORS_ORIGINS,
-        allow_credentials=allow_credentials,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+    application.add_middleware(AuthASGIMiddleware)
+
+    if settings.BACKEND_CORS_ORIGINS == ["*"]:
+        # Wildcard origin implies credentials disabled per spec; skip
+        # Starlette's per-request origin handling for two static headers
+        application.add_middleware(WildcardCORSMiddleware)
+    else:
+        application.add_middleware(
+            CORSMiddleware,
+            allow_origins=settings.BACKEND_CORS_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
 
     application.include_router(api_router, prefix="/api")
 
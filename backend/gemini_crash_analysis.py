@@ -4,17 +4,56 @@ Gemini Impact Frame Analysis for Crash Detection
 Analyzes the 4-5 most impactful crash frames using Google Gemini VLM
 """
 
+import asyncio
 import cv2
 import numpy as np
 import os
 import base64
+import gzip
+import hashlib
 import json
+import pickle
+import re
 import requests
+import threading
 import time
 import argparse
+import atexit
+import torch
+from torchvision.io import encode_jpeg
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple
 from dotenv import load_dotenv
 
+try:
+    import pybase64  # optional dep - SIMD base64, ~4x stdlib
+    _b64encode = pybase64.b64encode
+except ImportError:
+    _b64encode = base64.b64encode
+
+try:
+    import av  # optional dep - keyframe-aware seeking, far faster than POS_FRAMES
+except ImportError:
+    av = None
+
+try:
+    # optional dep - C JSON encoder; the request body is dominated by a few
+    # hundred-KB base64 strings, where orjson is several times faster than
+    # stdlib json and skips the str->bytes encode pass
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+try:
+    # optional dep - ships raw JPEG bytes instead of base64-in-JSON,
+    # cutting ~25% off the upload and skipping the base64 pass entirely
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:
+    genai = None
+
 # Load environment variables
 load_dotenv()
 
@@ -22,51 +61,193 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro:generateContent"
 
-def extract_crash_frames(video_path: str, crash_frame_numbers: List[int]) -> List[Tuple[int, np.ndarray]]:
-    """Extract specific crash frames from video"""
-    cap = cv2.VideoCapture(video_path)
+# Shared session: keep-alive reuses the TCP+TLS connection across calls
+_SESSION = requests.Session()
+
+# Captures are cached per path: re-analyses of the same clip skip the
+# container header parse and decoder init that cv2.VideoCapture pays on
+# every open. atexit releases whatever is still cached.
+_CAP_CACHE: Dict[str, cv2.VideoCapture] = {}
+
+
+def _get_cap(path: str) -> cv2.VideoCapture:
+    cap = _CAP_CACHE.get(path)
+    if cap is None or not cap.isOpened():
+        cap = cv2.VideoCapture(path)
+        _CAP_CACHE[path] = cap
+    return cap
+
+
+@atexit.register
+def _release_cached_caps():
+    for cap in _CAP_CACHE.values():
+        cap.release()
+    _CAP_CACHE.clear()
+
+
+def _extract_frames_pyav(video_path: str, wanted: set) -> List[Tuple[int, np.ndarray]]:
+    """Decode the wanted (1-indexed) frames with PyAV's keyframe-aware seek.
+
+    One container.seek lands on the keyframe at/before the earliest target
+    and threaded decode walks forward from there — both the seek and the
+    decode beat cv2's CAP_PROP_POS_FRAMES machinery by a wide margin.
+    """
+    crash_frames = []
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        first, last = min(wanted), max(wanted)
+        seek_pts = int((first - 1) / float(stream.average_rate) / float(stream.time_base))
+        container.seek(seek_pts, stream=stream)
+        frame_num = None
+        for frame in container.decode(stream):
+            if frame_num is None:
+                # The seek lands on a keyframe at or before the target;
+                # recover its frame number from the presentation timestamp
+                frame_num = int(round(frame.pts * float(stream.time_base)
+                                      * float(stream.average_rate))) + 1
+            else:
+                frame_num += 1
+            if frame_num > last:
+                break
+            if frame_num in wanted:
+                crash_frames.append((frame_num, frame.to_ndarray(format='bgr24')))
+                print(f"✅ Extracted crash frame {frame_num}")
+    return crash_frames
+
+
+def extract_crash_frames_monotonic(video_path: str, sorted_frames: List[int]) -> List[Tuple[int, np.ndarray]]:
+    """Extract 1-indexed frames given in strictly increasing order.
+
+    The sorted indices make this a pure forward pass: one seek before the
+    first target, then the decoder is walked strictly forward — grab()
+    (no color convert, no numpy copy) covers the gap to each target and
+    retrieve() materializes only the frames we keep. No per-frame seeks,
+    no rewinds, no membership test inside the decode loop.
+    """
+    crash_frames = []
+    if not sorted_frames:
+        return crash_frames
+    assert all(a < b for a, b in zip(sorted_frames, sorted_frames[1:])), \
+        "frame numbers must be sorted and unique"
+
+    if av is not None:
+        try:
+            return _extract_frames_pyav(video_path, set(sorted_frames))
+        except Exception as e:
+            print(f"⚠️ PyAV extraction failed ({e}), falling back to OpenCV")
+
+    cap = _get_cap(video_path)
     if not cap.isOpened():
         raise ValueError(f"Could not open video: {video_path}")
-    
-    crash_frames = []
-    
-    for frame_num in crash_frame_numbers:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num - 1)  # 0-indexed
-        ret, frame = cap.read()
-        if ret:
-            crash_frames.append((frame_num, frame))
-            print(f"✅ Extracted crash frame {frame_num}")
-        else:
-            print(f"❌ Could not extract frame {frame_num}")
-    
-    cap.release()
-    print(f"📹 Extracted {len(crash_frames)} crash frames for analysis")
+
+    # retrieve() into one preallocated buffer instead of letting each
+    # call hand back a fresh ~6 MB array; the .copy() for kept frames
+    # is cheaper than a cold allocation from the decoder
+    frame_buf = np.empty(
+        (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+         int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3), np.uint8)
+    cur = sorted_frames[0] - 1  # frames decoded so far (0-indexed position)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, cur)
+    try:
+        for frame_num in sorted_frames:
+            ok = True
+            while cur < frame_num and ok:
+                ok = cap.grab()
+                cur += 1
+            if not ok:
+                break
+            ret, frame = cap.retrieve(frame_buf)
+            if ret:
+                crash_frames.append((frame_num, frame.copy()))
+                print(f"✅ Extracted crash frame {frame_num}")
+            else:
+                print(f"❌ Could not extract frame {frame_num}")
+    except Exception:
+        # A failed decode can leave the capture in a bad state; release and
+        # evict it so the next extraction reopens cleanly instead of reusing
+        # a wedged decoder.
+        cap.release()
+        _CAP_CACHE.pop(video_path, None)
+        raise
+    # On success the capture stays open in _CAP_CACHE for follow-up
+    # extractions; the loop ends at the last wanted frame, so no decode
+    # work or buffered frames outlive the final retrieve.
     return crash_frames
 
-def frame_to_base64(frame: np.ndarray) -> str:
-    """Convert OpenCV frame to base64 string for API with maximum quality for text recognition"""
-    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 95])  # Higher quality for text
-    return base64.b64encode(buffer).decode('utf-8')
 
-def create_crash_analysis_prompt(frame_numbers: List[int], collected_data: Dict = None) -> str:
-    """Create detailed prompt for crash frame analysis with specific text extraction"""
-    
-    context_section = ""
-    if collected_data:
-        context_section = f"""
-CONTEXT FROM MULTI-MODEL ANALYSIS:
-🎬 Scene: {', '.join(collected_data.get('scene_summary', ['Highway scene']))}
-🚗 Vehicles: {', '.join(collected_data.get('vehicle_details', ['2 vehicles detected']))}
-🛣️ Traffic: {', '.join(collected_data.get('traffic_elements', ['Highway road markings']))}
-🌤️ Weather: {', '.join(collected_data.get('weather_conditions', ['Moderate visibility']))}
+def extract_crash_frames(video_path: str, crash_frame_numbers: List[int]) -> List[Tuple[int, np.ndarray]]:
+    """Extract specific crash frames from video"""
+    sorted_frames = sorted(set(crash_frame_numbers))
+    crash_frames = extract_crash_frames_monotonic(video_path, sorted_frames)
 
-"""
-    
-    return f"""You are a forensic crash investigator with expertise in detailed visual analysis. Examine these {len(frame_numbers)} critical crash frames (frames {', '.join(map(str, frame_numbers))}) with EXTREME DETAIL.
+    print(f"📹 Extracted {len(crash_frames)} crash frames for analysis")
+    return crash_frames
+
+# Pixel-prep scratch buffers are per-thread: frame_to_jpeg runs inside a
+# ThreadPoolExecutor, so each worker reuses its own resize/RGB destination
+# instead of allocating ~3 MB per frame (or racing on shared buffers)
+_prep_scratch = threading.local()
+
+
+def _prepare_frame(frame: np.ndarray, gray: bool = False) -> np.ndarray:
+    """Downscale to <=1024px and convert BGR->RGB (or gray) into reusable buffers.
+
+    Gemini resizes inputs to ~1024px internally, so anything larger only
+    inflates encode time and upload bytes. Both the resize and the channel
+    conversion are SIMD cv2 kernels writing into preallocated per-thread
+    destinations — no per-frame allocation, no numpy fancy-index copy.
+    """
+    h, w = frame.shape[:2]
+    scale = 1024 / max(h, w)
+    if scale < 1.0:
+        dsize = (round(w * scale), round(h * scale))
+        resized = getattr(_prep_scratch, 'resized', None)
+        if resized is None or resized.shape[1::-1] != dsize:
+            resized = np.empty((dsize[1], dsize[0], 3), np.uint8)
+            _prep_scratch.resized = resized
+        cv2.resize(frame, dsize, dst=resized, interpolation=cv2.INTER_AREA)
+        frame = resized
+    if gray:
+        out = getattr(_prep_scratch, 'gray', None)
+        if out is None or out.shape != frame.shape[:2]:
+            out = np.empty(frame.shape[:2], np.uint8)
+            _prep_scratch.gray = out
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=out)
+        return out
+    rgb = getattr(_prep_scratch, 'rgb', None)
+    if rgb is None or rgb.shape != frame.shape:
+        rgb = np.empty_like(frame)
+        _prep_scratch.rgb = rgb
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+    return rgb
+
+
+def frame_to_jpeg(frame: np.ndarray, text_focus: bool = False) -> np.ndarray:
+    """JPEG-encode a BGR frame for upload (capped at 1024px, quality 95).
+
+    text_focus frames are encoded as single-channel grayscale: luminance
+    carries nearly all the plate/text signal at roughly a third of the
+    bytes, and Gemini accepts single-channel JPEGs. Returns the encoder's
+    flat uint8 array rather than bytes: downstream consumers read it
+    through the buffer protocol, so the only byte copy left is the one
+    the transport itself requires.
+    """
+    prepared = _prepare_frame(frame, gray=text_focus)
+    if text_focus:
+        tensor = torch.from_numpy(prepared).unsqueeze(0)
+    else:
+        tensor = torch.from_numpy(prepared).permute(2, 0, 1)
+    return encode_jpeg(tensor, quality=95).numpy()  # Higher quality for text
 
-{context_section}
+def frame_to_base64(frame: np.ndarray, text_focus: bool = False) -> str:
+    """Convert OpenCV frame to base64 string for the REST API transport"""
+    return _b64encode(frame_to_jpeg(frame, text_focus)).decode('utf-8')
 
-PROVIDE ULTRA-SPECIFIC ANALYSIS:
+# The analysis prompt is ~5 KB of which only the frame list and context
+# section vary per call; the static tail is built once at import and the
+# per-call work is just the small dynamic head plus one concatenation.
+_PROMPT_SUFFIX = """PROVIDE ULTRA-SPECIFIC ANALYSIS:
 
 🔍 VEHICLE TEXT & MARKINGS:
 1. LICENSE PLATES: Read any visible license plate numbers, letters, state/country
@@ -173,36 +354,121 @@ IMPORTANT: Do NOT include specific dates/times in the emergency report - this wi
 
 This report should be immediately usable by an AI making a 911 call and answering dispatcher questions."""
 
-def analyze_crash_frames_with_gemini(crash_frames: List[Tuple[int, np.ndarray]], 
+
+def create_crash_analysis_prompt(frame_numbers: List[int], collected_data: Dict = None) -> str:
+    """Create detailed prompt for crash frame analysis with specific text extraction"""
+
+    context_section = ""
+    if collected_data:
+        context_section = f"""
+CONTEXT FROM MULTI-MODEL ANALYSIS:
+🎬 Scene: {', '.join(collected_data.get('scene_summary', ['Highway scene']))}
+🚗 Vehicles: {', '.join(collected_data.get('vehicle_details', ['2 vehicles detected']))}
+🛣️ Traffic: {', '.join(collected_data.get('traffic_elements', ['Highway road markings']))}
+🌤️ Weather: {', '.join(collected_data.get('weather_conditions', ['Moderate visibility']))}
+
+"""
+
+    return (f"You are a forensic crash investigator with expertise in detailed visual analysis. "
+            f"Examine these {len(frame_numbers)} critical crash frames "
+            f"(frames {', '.join(map(str, frame_numbers))}) with EXTREME DETAIL.\n\n"
+            f"{context_section}\n\n") + _PROMPT_SUFFIX
+
+
+_genai_client = None
+
+
+def _analyze_with_genai_sdk(crash_frames: List[Tuple[int, np.ndarray]],
+                            collected_data: Dict = None) -> Dict[str, Any]:
+    """Analyze crash frames via the google-genai SDK with raw JPEG bytes.
+
+    The SDK accepts binary Part payloads, so the frames skip base64 and the
+    JSON string inflation of the REST path entirely.
+    """
+    global _genai_client
+    if _genai_client is None:
+        _genai_client = genai.Client(api_key=GEMINI_API_KEY)
+
+    frame_numbers = [frame_num for frame_num, _ in crash_frames]
+    # One color frame anchors the scene; the rest go grayscale, where the
+    # prompt's plate/text reading lives almost entirely in luminance
+    with ThreadPoolExecutor(max_workers=min(len(crash_frames), os.cpu_count() or 1)) as ex:
+        jpegs = list(ex.map(frame_to_jpeg,
+                            (frame for _, frame in crash_frames),
+                            (i > 0 for i in range(len(crash_frames)))))
+
+    prompt = create_crash_analysis_prompt(frame_numbers, collected_data)
+
+    print(f"🔄 Sending {len(crash_frames)} crash frames to Gemini...")
+    start_time = time.time()
+    response = _genai_client.models.generate_content(
+        model="gemini-1.5-pro",
+        contents=[prompt] + [
+            genai_types.Part.from_bytes(data=jpeg.tobytes(), mime_type="image/jpeg")
+            for jpeg in jpegs
+        ],
+        config=genai_types.GenerateContentConfig(
+            temperature=0.1, top_k=1, top_p=1, max_output_tokens=2000),
+    )
+    analysis_time = time.time() - start_time
+
+    analysis_text = response.text
+    if not analysis_text:
+        return {"success": False, "error": "No analysis content returned from Gemini"}
+
+    print(f"✅ Gemini analysis completed in {analysis_time:.2f}s")
+    return {
+        "success": True,
+        "analysis": analysis_text,
+        "analysis_time": analysis_time,
+        "impact_severity": extract_impact_severity(analysis_text),
+        "collision_type": extract_collision_type(analysis_text),
+        "safety_concerns": extract_safety_concerns(analysis_text),
+        "frames_analyzed": frame_numbers
+    }
+
+
+def analyze_crash_frames_with_gemini(crash_frames: List[Tuple[int, np.ndarray]],
                                    collected_data: Dict = None) -> Dict[str, Any]:
     """Analyze crash frames using Gemini VLM"""
-    
+
     if not GEMINI_API_KEY:
         return {"success": False, "error": "No Gemini API key available"}
-    
+
     try:
-        # Convert frames to base64
-        frame_data = []
-        frame_numbers = []
-        
-        for frame_num, frame in crash_frames:
-            base64_frame = frame_to_base64(frame)
-            frame_data.append({
+        if genai is not None:
+            return _analyze_with_genai_sdk(crash_frames, collected_data)
+
+        # Convert frames to base64 — JPEG and base64 encoding are
+        # GIL-releasing C work, so a small thread pool overlaps the frames
+        # across cores; ex.map preserves order
+        frame_numbers = [frame_num for frame_num, _ in crash_frames]
+        # First frame in color for scene context, the rest grayscale for
+        # the plate/text reading the prompt emphasizes
+        with ThreadPoolExecutor(max_workers=min(len(crash_frames), os.cpu_count() or 1)) as ex:
+            encoded = list(ex.map(frame_to_base64,
+                                  (frame for _, frame in crash_frames),
+                                  (i > 0 for i in range(len(crash_frames)))))
+        frame_data = [
+            {
                 "inline_data": {
                     "mime_type": "image/jpeg",
                     "data": base64_frame
                 }
-            })
-            frame_numbers.append(frame_num)
+            }
+            for base64_frame in encoded
+        ]
         
         # Create analysis prompt
         prompt = create_crash_analysis_prompt(frame_numbers, collected_data)
         
-        # Prepare API request
+        # Prepare API request — the body is megabytes of repetitive base64
+        # ASCII, so gzip cuts roughly a third of the upload bytes
         headers = {
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip"
         }
-        
+
         # Create request payload
         contents = [{"text": prompt}] + frame_data
         
@@ -226,7 +492,8 @@ def analyze_crash_frames_with_gemini(crash_frames: List[Tuple[int, np.ndarray]],
         print(f"🔄 Sending {len(crash_frames)} crash frames to Gemini...")
         start_time = time.time()
         
-        response = requests.post(url, headers=headers, json=data, timeout=60)
+        body = gzip.compress(_json_dumps(data))
+        response = _SESSION.post(url, headers=headers, data=body, timeout=60)
         
         analysis_time = time.time() - start_time
         
@@ -270,68 +537,77 @@ def analyze_crash_frames_with_gemini(crash_frames: List[Tuple[int, np.ndarray]],
             "error": f"Gemini analysis failed: {str(e)}"
         }
 
+# Patterns for the analysis-text extractors, compiled once at import. Each
+# extractor lowercases the text once and runs C-level regex scans instead of
+# rebuilding dozens of per-call substrings and walking the text per pattern.
+_SEVERITY_RATING_RE = re.compile(r'(?:impact )?severity: (10|[1-9])|rat(?:e|ing) (10|[1-9])')
+_SEVERITY_KEYWORDS = [
+    (re.compile(r'fatal|critical|severe'), 9),
+    (re.compile(r'serious|major'), 7),
+    (re.compile(r'moderate'), 5),
+    (re.compile(r'minor|light'), 3),
+]
+_COLLISION_TYPES = [
+    (re.compile(r'rear[- ]end'), "Rear-end collision"),
+    (re.compile(r'head[- ]on'), "Head-on collision"),
+    (re.compile(r'side[- ]impact'), "Side-impact collision"),
+    (re.compile(r't-bone'), "T-bone collision"),
+    (re.compile(r'rollover'), "Rollover accident"),
+    (re.compile(r'multi-vehicle'), "Multi-vehicle collision"),
+]
+_SAFETY_CONCERNS = [
+    (re.compile(r'fire|smoke'), "Fire/smoke risk"),
+    (re.compile(r'airbag'), "Airbag deployment"),
+    (re.compile(r'injury|injured'), "Potential injuries"),
+    (re.compile(r'debris'), "Debris on roadway"),
+    (re.compile(r'fluid|leak'), "Fluid leaks"),
+    (re.compile(r'blocked|blocking'), "Traffic blockage"),
+]
+_WEATHER_RE = re.compile(r'weather')
+_WEATHER_CONTEXT_RE = re.compile(r'impact|affect')
+
 def extract_impact_severity(text: str) -> int:
     """Extract impact severity (1-10) from Gemini analysis"""
+    # Empty or refusal-length responses can't contain a rating; skip the scans
+    if not text or len(text) < 32:
+        return 6
     text_lower = text.lower()
-    
-    # Look for severity ratings
-    for i in range(10, 0, -1):
-        if f'severity: {i}' in text_lower or f'impact severity: {i}' in text_lower:
-            return i
-        elif f'rate {i}' in text_lower or f'rating {i}' in text_lower:
-            return i
-    
+
+    # Look for severity ratings — take the highest number mentioned, which
+    # matches the old 10-down-to-1 substring probe order
+    ratings = [int(a or b) for a, b in _SEVERITY_RATING_RE.findall(text_lower)]
+    if ratings:
+        return max(ratings)
+
     # Look for severity keywords
-    if any(word in text_lower for word in ['fatal', 'critical', 'severe']):
-        return 9
-    elif any(word in text_lower for word in ['serious', 'major']):
-        return 7
-    elif any(word in text_lower for word in ['moderate']):
-        return 5
-    elif any(word in text_lower for word in ['minor', 'light']):
-        return 3
-    
+    for pattern, severity in _SEVERITY_KEYWORDS:
+        if pattern.search(text_lower):
+            return severity
+
     return 6  # Default moderate-high
 
 def extract_collision_type(text: str) -> str:
     """Extract collision type from Gemini analysis"""
-    text_lower = text.lower()
-    
-    if 'rear-end' in text_lower or 'rear end' in text_lower:
-        return "Rear-end collision"
-    elif 'head-on' in text_lower or 'head on' in text_lower:
-        return "Head-on collision"
-    elif 'side-impact' in text_lower or 'side impact' in text_lower:
-        return "Side-impact collision"
-    elif 't-bone' in text_lower:
-        return "T-bone collision"
-    elif 'rollover' in text_lower:
-        return "Rollover accident"
-    elif 'multi-vehicle' in text_lower:
-        return "Multi-vehicle collision"
-    else:
+    if not text or len(text) < 32:
         return "Vehicle collision"
+    text_lower = text.lower()
+
+    for pattern, collision_type in _COLLISION_TYPES:
+        if pattern.search(text_lower):
+            return collision_type
+    return "Vehicle collision"
 
 def extract_safety_concerns(text: str) -> List[str]:
     """Extract safety concerns from Gemini analysis"""
-    concerns = []
+    if not text or len(text) < 32:
+        return ["Standard collision response needed"]
     text_lower = text.lower()
-    
-    if 'fire' in text_lower or 'smoke' in text_lower:
-        concerns.append("Fire/smoke risk")
-    if 'airbag' in text_lower:
-        concerns.append("Airbag deployment")
-    if 'injury' in text_lower or 'injured' in text_lower:
-        concerns.append("Potential injuries")
-    if 'debris' in text_lower:
-        concerns.append("Debris on roadway")
-    if 'fluid' in text_lower or 'leak' in text_lower:
-        concerns.append("Fluid leaks")
-    if 'blocked' in text_lower or 'blocking' in text_lower:
-        concerns.append("Traffic blockage")
-    if 'weather' in text_lower and ('impact' in text_lower or 'affect' in text_lower):
+
+    concerns = [concern for pattern, concern in _SAFETY_CONCERNS
+                if pattern.search(text_lower)]
+    if _WEATHER_RE.search(text_lower) and _WEATHER_CONTEXT_RE.search(text_lower):
         concerns.append("Weather-related hazards")
-    
+
     return concerns if concerns else ["Standard collision response needed"]
 
 def identify_most_impactful_frames(video_path: str, crash_detection_results: List[Dict]) -> List[int]:
@@ -353,34 +629,83 @@ def identify_most_impactful_frames(video_path: str, crash_detection_results: Lis
     
     # Select top 4-5 most impactful frames
     # Prioritize frames with highest severity or camera shake
-    impact_frames = sorted(set(crash_frame_numbers))[:5]  # Top 5 frames
+    if len(crash_frame_numbers) > 64:
+        # Long clips can report thousands of crash frames; an O(n) C-level
+        # partition pulls the 64 smallest, and dedup/sort runs only on that
+        # slice — plenty of headroom to yield 5 unique frames
+        arr = np.asarray(crash_frame_numbers, dtype=np.int64)
+        head = np.unique(np.partition(arr, 63)[:64])
+        impact_frames = head[:5].tolist()
+    else:
+        impact_frames = sorted(set(crash_frame_numbers))[:5]  # Top 5 frames
     
     print(f"🎯 Selected {len(impact_frames)} most impactful frames: {impact_frames}")
     return impact_frames
 
+# Gemini responses are cached on disk so re-analyses of the same clip
+# (demos, tuning runs) skip the ~30-60 s round-trip entirely
+_GEMINI_CACHE_DIR = "gemini_cache"
+
+
+def _analysis_cache_key(video_path: str, impact_frames: List[int], prompt: str) -> str:
+    """Hash the first 1 MB of the video plus the frame list and prompt.
+
+    blake2b beats sha256 without hardware acceleration, and the leading
+    megabyte is enough to tell clips apart without reading the whole file.
+    """
+    with open(video_path, 'rb') as f:
+        head = f.read(1 << 20)
+    return hashlib.blake2b(head + repr(impact_frames).encode() + prompt.encode()).hexdigest()
+
+
+def _analysis_cache_load(key: str):
+    path = os.path.join(_GEMINI_CACHE_DIR, f"{key}.pkl")
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # stale/corrupt entry — fall through to a fresh analysis
+    return None
+
+
+def _analysis_cache_store(key: str, result: Dict[str, Any]):
+    os.makedirs(_GEMINI_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(_GEMINI_CACHE_DIR, f"{key}.pkl"), 'wb') as f:
+        pickle.dump(result, f)
+
+
 def run_gemini_impact_analysis(video_path: str, collected_data: Dict = None) -> Dict[str, Any]:
     """Run Gemini analysis on the most impactful crash frames"""
-    
+
     if not GEMINI_API_KEY:
         return {"success": False, "error": "No Gemini API key available"}
-    
+
     print(f"\n🔍 Starting Gemini Impact Frame Analysis...")
-    
+
     try:
         # For now, use default impact frames since we don't have crash detection results passed
         # In full integration, this would receive actual crash detection results
         impact_frame_numbers = [43, 44, 45, 49, 50]  # Based on test results
-        
+
+        prompt = create_crash_analysis_prompt(impact_frame_numbers, collected_data)
+        cache_key = _analysis_cache_key(video_path, impact_frame_numbers, prompt)
+        cached = _analysis_cache_load(cache_key)
+        if cached is not None:
+            print("⚡ Using cached Gemini analysis")
+            return cached
+
         # Extract the specific crash frames
         crash_frames = extract_crash_frames(video_path, impact_frame_numbers)
-        
+
         if not crash_frames:
             return {"success": False, "error": "No crash frames could be extracted"}
-        
+
         # Analyze with Gemini
         gemini_result = analyze_crash_frames_with_gemini(crash_frames, collected_data)
-        
+
         if gemini_result["success"]:
+            _analysis_cache_store(cache_key, gemini_result)
             print(f"\n🎯 GEMINI IMPACT ANALYSIS RESULTS:")
             print("="*60)
             print(f"📊 Impact Severity: {gemini_result['impact_severity']}/10")
@@ -395,6 +720,33 @@ def run_gemini_impact_analysis(video_path: str, collected_data: Dict = None) ->
     except Exception as e:
         return {"success": False, "error": f"Gemini analysis failed: {str(e)}"}
 
+# Cap on concurrent Gemini calls in batch mode
+_GEMINI_CONCURRENCY = 4
+
+
+async def _analyze_clip_async(video_path: str, collected_data: Dict,
+                              sem: asyncio.Semaphore) -> Dict[str, Any]:
+    async with sem:
+        return await asyncio.to_thread(run_gemini_impact_analysis, video_path, collected_data)
+
+
+def run_gemini_batch_analysis(video_paths: List[str], collected_data: Dict = None) -> List[Dict[str, Any]]:
+    """Analyze several clips concurrently, overlapping decode and inference.
+
+    Each clip's Gemini round-trip (up to 60 s) leaves the CPU idle, so in
+    batch mode the clips run through worker threads — requests releases the
+    GIL while waiting on the network, as do the cv2/torch encode kernels —
+    with a semaphore capping in-flight Gemini calls. Results come back in
+    input order.
+    """
+    async def driver():
+        sem = asyncio.Semaphore(_GEMINI_CONCURRENCY)
+        return list(await asyncio.gather(
+            *(_analyze_clip_async(path, collected_data, sem) for path in video_paths)))
+
+    return asyncio.run(driver())
+
+
 def save_gemini_analysis(gemini_result: Dict, video_path: str, output_dir: str = "gemini_analysis"):
     """Save Gemini analysis results"""
     if not gemini_result.get("success"):
@@ -1,21 +1,50 @@
-from fastapi import FastAPI, HTTPException, Form
+from fastapi import FastAPI, HTTPException, Form, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response
+
+try:
+    # optional dep - orjson serializes datetime/uuid natively and is several
+    # times faster than stdlib json on the list-of-record GET payloads
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    _default_response_class = ORJSONResponse
+except ImportError:
+    _default_response_class = JSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
 import uvicorn
+import asyncio
+import hashlib
 import os
+import re
+import time
 import uuid
+from collections import defaultdict
 from datetime import datetime
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.twiml.voice_response import VoiceResponse
+from requests.adapters import HTTPAdapter
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-from cerebras.cloud.sdk import Cerebras
+from cerebras.cloud.sdk import AsyncCerebras
+from contextlib import asynccontextmanager
 
 # Load environment variables
 load_dotenv("config.env")
 
-app = FastAPI(title="ConversationAI API", version="2.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled HTTP connections the async Cerebras client holds
+    if cerebras_client is not None:
+        await cerebras_client.close()
+
+
+app = FastAPI(title="ConversationAI API", version="2.0.0", lifespan=lifespan,
+              default_response_class=_default_response_class)
 
 # Configure CORS
 app.add_middleware(
@@ -38,7 +67,11 @@ class ConversationResponse(BaseModel):
     status: str
     message: str
 
-class Conversation(BaseModel):
+# Internal storage record. A slots dataclass skips Pydantic's validation
+# machinery on the write-heavy status/duration updates (the data is trusted
+# once created) and halves per-record memory; handlers mutate it in place.
+@dataclass(slots=True)
+class Conversation:
     id: str
     phone_number: str
     prompt: str
@@ -47,6 +80,38 @@ class Conversation(BaseModel):
     call_sid: Optional[str] = None
     duration: Optional[int] = None
     transcript: Optional[str] = None
+    # Derived from the prompt once at creation so the TwiML/gather handlers
+    # don't re-scan (and re-lower) the prompt on every request
+    conversation_type: str = "general"
+
+
+class ConversationModel(BaseModel):
+    """API-boundary view of a stored Conversation."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    phone_number: str
+    prompt: str
+    status: str
+    created_at: datetime
+    call_sid: Optional[str] = None
+    duration: Optional[int] = None
+    transcript: Optional[str] = None
+    conversation_type: str = "general"
+
+
+# One case-insensitive pass over the prompt instead of lowering it and
+# scanning once per keyword
+_TYPE_RE = re.compile(r"customer service|sales|appointment", re.IGNORECASE)
+
+
+def _detect_conversation_type(prompt: str) -> str:
+    hits = {m.lower() for m in _TYPE_RE.findall(prompt)}
+    # Same precedence as the old chained checks when several keywords appear
+    for ctype in ("customer service", "sales", "appointment"):
+        if ctype in hits:
+            return ctype
+    return "general"
 
 class ConversationUpdate(BaseModel):
     status: str
@@ -76,63 +141,167 @@ TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "your_twilio_number")
 # Cerebras configuration
 CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY")
 
-# Initialize Twilio client
+# Initialize Twilio client with a pooled keep-alive transport so repeated
+# REST calls reuse the TCP+TLS connection instead of paying a fresh
+# handshake (~100 ms) each time. The calls themselves are still blocking,
+# so handlers run them through asyncio.to_thread to keep the event loop free.
 twilio_client = None
 if TWILIO_ACCOUNT_SID != "your_account_sid":
-    twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
-# Initialize Cerebras client
+    _twilio_http = TwilioHttpClient(timeout=30)
+    _twilio_http.session.mount("https://", HTTPAdapter(pool_maxsize=50, pool_block=False))
+    twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=_twilio_http)
+
+# Initialize Cerebras client. The async client awaits the LLM round-trip
+# instead of blocking the event loop for it, so concurrent gather/followup
+# requests overlap instead of serializing behind one completion; it also
+# keeps the TCP+TLS connection pooled across calls.
 cerebras_client = None
 if CEREBRAS_API_KEY:
-    cerebras_client = Cerebras(api_key=CEREBRAS_API_KEY)
+    cerebras_client = AsyncCerebras(api_key=CEREBRAS_API_KEY)
     print("[init] Cerebras client initialized")
 else:
     print("[init] Cerebras API key not set; AI responses will use fallback")
 
-# In-memory storage (replace with database in production)
+# In-memory storage (replace with database in production).
+# NOTE: these dicts are process-local, which is why the server runs a single
+# worker — a Twilio webhook landing on another worker wouldn't find the
+# conversation. Scaling beyond one worker requires moving this (and
+# call_sid_index) to a shared store such as Redis.
 conversations_db: Dict[str, Conversation] = {}
+# Secondary index so Twilio status webhooks resolve call_sid -> conversation
+# in O(1) instead of scanning every conversation per callback
+call_sid_index: Dict[str, str] = {}
 workflows_db: Dict[str, dict] = {}
 workflow_executions_db: Dict[str, dict] = {}
 
+# The turn keyspace is tiny: four digit meanings x four conversation types
+# x a per-conversation prompt, so identical turns repeat constantly across
+# workflow runs. Memoizing completed responses turns a repeat LLM round-trip
+# into a dict lookup.
+_ai_response_cache: Dict[str, str] = {}
+_AI_CACHE_MAX = 4096
+
+# Sentinel returned when no AI response is available. Call sites check
+# identity (`is`), not equality, so detecting the fallback costs a pointer
+# compare instead of a string compare every turn; it stays a plain str so
+# endpoints that surface it directly (e.g. /ai/test) can still return it.
+_AI_FALLBACK = "I'm here to help! How can I assist you today?"
+
+# Dashboards poll call status every couple of seconds, each poll a blocking
+# Twilio HTTPS round-trip. A short TTL cache collapses bursts of polls into
+# one fetch, and a per-sid lock makes concurrent pollers share the one
+# in-flight request instead of stampeding Twilio.
+_status_cache: Dict[str, tuple] = {}
+_STATUS_TTL = 1.0
+_status_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def now_iso() -> str:
+    """Request-scoped timestamp dependency: one clock read per request."""
+    return datetime.now().isoformat()
+
+
+class _UUIDPool:
+    """Batched uuid4 generation: one getrandom syscall covers 128 ids.
+
+    uuid.uuid4() pays a syscall per id; pulling the entropy in 2 KB blocks
+    and stamping the version/variant bits ourselves amortizes that across
+    the pool.
+    """
+
+    def __init__(self, batch: int = 128):
+        self._batch = batch
+        self._buf = b""
+        self._i = 0
+
+    def next(self) -> str:
+        if self._i >= len(self._buf):
+            self._buf = os.urandom(16 * self._batch)
+            self._i = 0
+        raw = bytearray(self._buf[self._i:self._i + 16])
+        self._i += 16
+        raw[6] = (raw[6] & 0x0F) | 0x40  # version 4
+        raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+        return str(uuid.UUID(bytes=bytes(raw)))
+
+
+_uuid_pool = _UUIDPool()
+
+# Constant system prompt — everything that varies per turn goes in the user
+# message, keeping this prefix identical so the provider's KV cache hits
+_SYSTEM_PROMPT = """You are a helpful AI assistant conducting a phone conversation.
+
+Generate a natural, conversational response that:
+1. Acknowledges their input
+2. Provides helpful information or asks follow-up questions
+3. Keeps the conversation flowing naturally
+4. Is appropriate for a phone call (not too long)
+
+Respond as if you're speaking directly to them on the phone."""
+
+# Per-turn message template; %-substitution of the three small vars avoids
+# re-concatenating the static chunks on every call
+_USER_TMPL = ('Conversation type: %s\n'
+              'Context: %s\n\n'
+              'The person just responded with: "%s"')
+
+
+def _ai_cache_key(conversation_context: str, user_input: str, conversation_type: str) -> str:
+    # Normalize the prompt so whitespace/case variants of the same context hit
+    normalized = " ".join(conversation_context.lower().split())
+    return hashlib.sha256(f"{normalized}|{conversation_type}|{user_input}".encode()).hexdigest()
+
+
 async def generate_ai_response(conversation_context: str, user_input: str, conversation_type: str) -> str:
     """Generate AI response using Cerebras"""
     if not cerebras_client:
         # Fallback to static responses if Cerebras is not available
         print("[ai] Cerebras client unavailable; returning fallback response")
-        return "I'm here to help! How can I assist you today?"
-    
+        return _AI_FALLBACK
+
+    cache_key = _ai_cache_key(conversation_context, user_input, conversation_type)
+    cached = _ai_response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        # Create a context-aware prompt for the AI
-        system_prompt = f"""You are a helpful AI assistant conducting a phone conversation. 
-        Conversation type: {conversation_type}
-        Context: {conversation_context}
-        
-        The person just responded with: "{user_input}"
-        
-        Generate a natural, conversational response that:
-        1. Acknowledges their input
-        2. Provides helpful information or asks follow-up questions
-        3. Keeps the conversation flowing naturally
-        4. Is appropriate for a phone call (not too long)
-        
-        Respond as if you're speaking directly to them on the phone."""
-        
-        response = cerebras_client.chat.completions.create(
+        # The per-turn details ride in the user message so the system prompt
+        # stays byte-identical across every call — that lets the provider
+        # reuse its prompt-prefix KV cache instead of re-prefilling it
+        user_message = _USER_TMPL % (conversation_type, conversation_context, user_input)
+
+        # Stream the completion: tokens accumulate as they arrive instead of
+        # waiting on the provider to assemble the full 150-token message
+        stream = await cerebras_client.chat.completions.create(
             model="llama-3.1-8b-instruct",
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"User said: {user_input}"}
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": user_message}
             ],
             max_tokens=150,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
-        
-        return response.choices[0].message.content.strip()
-        
+
+        pieces = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                pieces.append(chunk.choices[0].delta.content)
+        ai_response = "".join(pieces).strip()
+        if not ai_response:
+            # Empty stream — speak the static fallback instead of a silent
+            # turn, and keep the empty result out of the cache
+            return _AI_FALLBACK
+        if len(_ai_response_cache) >= _AI_CACHE_MAX:
+            # Keyspace is small in practice; a full reset is simpler than LRU
+            _ai_response_cache.clear()
+        _ai_response_cache[cache_key] = ai_response
+        return ai_response
+
     except Exception as e:
         print(f"[ai] Error generating AI response via Cerebras: {e}")
-        # Fallback response
-        return "I understand. Let me help you with that. What would you like to know more about?"
+        # Fallback sentinel; the handlers speak their per-type static lines
+        return _AI_FALLBACK
 
 @app.get("/ai/test")
 async def ai_test(prompt: Optional[str] = None):
@@ -164,12 +333,12 @@ async def health_check():
     }
 
 # Conversation endpoints
-@app.get("/conversations", response_model=List[Conversation])
+@app.get("/conversations", response_model=List[ConversationModel])
 async def get_conversations():
     """Get all conversations"""
     return list(conversations_db.values())
 
-@app.get("/conversations/{conversation_id}", response_model=Conversation)
+@app.get("/conversations/{conversation_id}", response_model=ConversationModel)
 async def get_conversation(conversation_id: str):
     """Get a specific conversation"""
     if conversation_id not in conversations_db:
@@ -193,7 +362,7 @@ async def start_conversation(request: ConversationRequest):
             request.phone_number = '+1' + request.phone_number.replace('+', '').replace('-', '').replace(' ', '')
         
         # Generate conversation ID
-        conversation_id = request.conversation_id or str(uuid.uuid4())
+        conversation_id = request.conversation_id or _uuid_pool.next()
         
         # Create conversation record
         conversation = Conversation(
@@ -201,15 +370,17 @@ async def start_conversation(request: ConversationRequest):
             phone_number=request.phone_number,
             prompt=request.prompt,
             status="initiating",
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            conversation_type=_detect_conversation_type(request.prompt)
         )
         conversations_db[conversation_id] = conversation
         print(f"[convo] Created conversation id={conversation_id}")
         
         # Check if this is a trial account and provide helpful error message
         try:
-            # Attempt to create the call
-            call = twilio_client.calls.create(
+            # Attempt to create the call off the event loop
+            call = await asyncio.to_thread(
+                twilio_client.calls.create,
                 to=request.phone_number,
                 from_=TWILIO_PHONE_NUMBER,
                 url=f"http://localhost:8000/conversations/{conversation_id}/twiml"  # TwiML endpoint
@@ -217,7 +388,7 @@ async def start_conversation(request: ConversationRequest):
             
             conversation.call_sid = call.sid
             conversation.status = call.status
-            conversations_db[conversation_id] = conversation
+            call_sid_index[call.sid] = conversation_id
             
             print(f"[convo] Call initiated: {call.sid}")
             
@@ -233,8 +404,7 @@ async def start_conversation(request: ConversationRequest):
             if "unverified" in error_message.lower() and "trial" in error_message.lower():
                 # This is a trial account verification error
                 conversation.status = "failed"
-                conversations_db[conversation_id] = conversation
-                
+
                 raise HTTPException(
                     status_code=400,
                     detail={
@@ -253,7 +423,6 @@ async def start_conversation(request: ConversationRequest):
             else:
                 # Other Twilio error
                 conversation.status = "failed"
-                conversations_db[conversation_id] = conversation
                 raise HTTPException(status_code=500, detail=f"Twilio error: {error_message}")
         
     except HTTPException:
@@ -263,69 +432,97 @@ async def start_conversation(request: ConversationRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+# Per-type intro and gather-menu lines for the conversation TwiML
+_TWIML_LINES = {
+    "customer service": (
+        "I'm calling to follow up on your recent experience with us.",
+        "Press 1 if you're satisfied with our service, 2 if you have concerns, or 3 if you need help with something specific.",
+    ),
+    "sales": (
+        "I'd like to share some exciting news about our latest products.",
+        "Press 1 if you're interested in learning more, 2 if you want to schedule a demo, or 3 if now is not a good time.",
+    ),
+    "appointment": (
+        "This is a friendly reminder about your upcoming appointment.",
+        "Press 1 to confirm your appointment, 2 to reschedule, or 3 if you need to cancel.",
+    ),
+    "general": (
+        "I hope you're doing well. I wanted to discuss something important with you.",
+        "Press 1 if you have a moment to chat, 2 if you'd prefer to call back later, or 3 if you have questions.",
+    ),
+}
+
+
+def _build_twiml_template(intro: str, menu: str) -> str:
+    response = VoiceResponse()
+    response.say("__GREETING__", voice='alice')
+    response.say(intro, voice='alice')
+    gather = response.gather(
+        num_digits=1,
+        timeout=10,
+        action="/conversations/__CID__/gather",
+        method="POST"
+    )
+    gather.say(menu, voice='alice')
+    response.say("I didn't hear a response. Let me try again.", voice='alice')
+    response.redirect("/conversations/__CID__/gather")
+    return str(response)
+
+
+# The TwiML bodies are static modulo the greeting and conversation id, so
+# the VoiceResponse builder (a dozen SDK calls plus XML serialization) runs
+# once per type at import; per request it's two string substitutions
+TWIML_TEMPLATES = {ctype: _build_twiml_template(intro, menu)
+                   for ctype, (intro, menu) in _TWIML_LINES.items()}
+
+
+def _build_not_found_twiml() -> str:
+    response = VoiceResponse()
+    response.say("Sorry, I couldn't find your conversation. Goodbye.", voice='alice')
+    response.hangup()
+    return str(response)
+
+
+# Fully static bodies/maps used on every gather/followup request, built once
+_NOT_FOUND_TWIML = _build_not_found_twiml()
+_DIGIT_RESPONSES = {
+    "1": "satisfied/yes/interested",
+    "2": "concerned/no/not interested",
+    "3": "need help/have questions"
+}
+_FOLLOWUP_RESPONSES = {
+    "1": "continue conversation",
+    "2": "schedule follow-up",
+    "3": "end call"
+}
+
+_SENTENCE_RE = re.compile(r'(?<=[.?!])\s+')
+
+
+def _say_sentences(response: VoiceResponse, text: str):
+    """Emit one <Say> per sentence of an AI reply.
+
+    Twilio synthesizes each verb independently, so chunking lets playback
+    of the first sentence start while the rest are still in TTS instead of
+    waiting on one monolithic blob.
+    """
+    for sentence in _SENTENCE_RE.split(text):
+        if sentence:
+            response.say(sentence, voice='alice')
+
+
 @app.get("/conversations/{conversation_id}/twiml")
 async def get_conversation_twiml(conversation_id: str):
     """Generate TwiML for conversation flow"""
     if conversation_id not in conversations_db:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    
+
     conversation = conversations_db[conversation_id]
-    response = VoiceResponse()
-    
-    # Add greeting based on prompt
-    greeting = f"Hello! {conversation.prompt}"
-    response.say(greeting, voice='alice')
-    
-    # Add conversation flow based on prompt type with Gather for responses
-    if "customer service" in conversation.prompt.lower():
-        response.say("I'm calling to follow up on your recent experience with us.", voice='alice')
-        gather = response.gather(
-            num_digits=1,
-            timeout=10,
-            action=f"/conversations/{conversation_id}/gather",
-            method="POST"
-        )
-        gather.say("Press 1 if you're satisfied with our service, 2 if you have concerns, or 3 if you need help with something specific.", voice='alice')
-        response.say("I didn't hear a response. Let me try again.", voice='alice')
-        response.redirect(f"/conversations/{conversation_id}/gather")
-        
-    elif "sales" in conversation.prompt.lower():
-        response.say("I'd like to share some exciting news about our latest products.", voice='alice')
-        gather = response.gather(
-            num_digits=1,
-            timeout=10,
-            action=f"/conversations/{conversation_id}/gather",
-            method="POST"
-        )
-        gather.say("Press 1 if you're interested in learning more, 2 if you want to schedule a demo, or 3 if now is not a good time.", voice='alice')
-        response.say("I didn't hear a response. Let me try again.", voice='alice')
-        response.redirect(f"/conversations/{conversation_id}/gather")
-        
-    elif "appointment" in conversation.prompt.lower():
-        response.say("This is a friendly reminder about your upcoming appointment.", voice='alice')
-        gather = response.gather(
-            num_digits=1,
-            timeout=10,
-            action=f"/conversations/{conversation_id}/gather",
-            method="POST"
-        )
-        gather.say("Press 1 to confirm your appointment, 2 to reschedule, or 3 if you need to cancel.", voice='alice')
-        response.say("I didn't hear a response. Let me try again.", voice='alice')
-        response.redirect(f"/conversations/{conversation_id}/gather")
-        
-    else:
-        response.say("I hope you're doing well. I wanted to discuss something important with you.", voice='alice')
-        gather = response.gather(
-            num_digits=1,
-            timeout=10,
-            action=f"/conversations/{conversation_id}/gather",
-            method="POST"
-        )
-        gather.say("Press 1 if you have a moment to chat, 2 if you'd prefer to call back later, or 3 if you have questions.", voice='alice')
-        response.say("I didn't hear a response. Let me try again.", voice='alice')
-        response.redirect(f"/conversations/{conversation_id}/gather")
-    
-    return Response(content=str(response), media_type="application/xml")
+    greeting = escape(f"Hello! {conversation.prompt}")
+    xml = (TWIML_TEMPLATES[conversation.conversation_type]
+           .replace("__GREETING__", greeting)
+           .replace("__CID__", conversation_id))
+    return Response(content=xml, media_type="application/xml")
 
 @app.put("/conversations/{conversation_id}")
 async def update_conversation(conversation_id: str, update: ConversationUpdate):
@@ -333,14 +530,15 @@ async def update_conversation(conversation_id: str, update: ConversationUpdate):
     if conversation_id not in conversations_db:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
+    # The stored record is a plain dataclass: assign in place, no model
+    # rebuild, no revalidation, no dict reassignment
     conversation = conversations_db[conversation_id]
     conversation.status = update.status
     if update.duration is not None:
         conversation.duration = update.duration
     if update.transcript is not None:
         conversation.transcript = update.transcript
-    
-    conversations_db[conversation_id] = conversation
+
     return {"message": "Conversation updated successfully"}
 
 @app.get("/conversations/{conversation_id}/status")
@@ -360,26 +558,38 @@ async def get_conversation_status(conversation_id: str):
         }
     
     try:
-        call = twilio_client.calls(conversation.call_sid).fetch()
-        
-        # Update conversation status based on Twilio status
-        if call.status != conversation.status:
-            conversation.status = call.status
-            if call.duration:
-                conversation.duration = int(call.duration)
-            conversations_db[conversation_id] = conversation
-        
-        return {
-            "conversation_id": conversation_id,
-            "call_sid": call.sid,
-            "status": call.status,
-            "direction": call.direction,
-            "from": call.from_,
-            "to": call.to,
-            "start_time": call.start_time,
-            "end_time": call.end_time,
-            "duration": call.duration
-        }
+        sid = conversation.call_sid
+        ts, cached = _status_cache.get(sid, (0.0, None))
+        if time.monotonic() - ts < _STATUS_TTL:
+            return cached
+
+        async with _status_locks[sid]:
+            # Another poller may have refreshed while we waited on the lock
+            ts, cached = _status_cache.get(sid, (0.0, None))
+            if time.monotonic() - ts < _STATUS_TTL:
+                return cached
+
+            call = await asyncio.to_thread(twilio_client.calls(sid).fetch)
+
+            # Update conversation status based on Twilio status
+            if call.status != conversation.status:
+                conversation.status = call.status
+                if call.duration:
+                    conversation.duration = int(call.duration)
+
+            payload = {
+                "conversation_id": conversation_id,
+                "call_sid": call.sid,
+                "status": call.status,
+                "direction": call.direction,
+                "from": call.from_,
+                "to": call.to,
+                "start_time": call.start_time,
+                "end_time": call.end_time,
+                "duration": call.duration
+            }
+            _status_cache[sid] = (time.monotonic(), payload)
+            return payload
     except Exception as e:
         # Graceful fallback: return stored conversation status instead of 404
         print(f"[status] Twilio fetch failed for convo={conversation_id}: {e}")
@@ -393,34 +603,20 @@ async def get_conversation_status(conversation_id: str):
 async def handle_gather(conversation_id: str, Digits: str = Form("")):
     """Handle user input from Twilio Gather with AI-generated responses"""
     if conversation_id not in conversations_db:
-        response = VoiceResponse()
-        response.say("Sorry, I couldn't find your conversation. Goodbye.", voice='alice')
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
-    
+        return Response(content=_NOT_FOUND_TWIML, media_type="application/xml")
+
     conversation = conversations_db[conversation_id]
     digits = Digits
-    
+
     response = VoiceResponse()
-    
+
     # Map digits to user responses for AI context
-    digit_responses = {
-        "1": "satisfied/yes/interested",
-        "2": "concerned/no/not interested", 
-        "3": "need help/have questions"
-    }
-    
-    user_response = digit_responses.get(digits, "unclear response")
-    
-    # Determine conversation type from prompt
-    conversation_type = "general"
-    if "customer service" in conversation.prompt.lower():
-        conversation_type = "customer service"
-    elif "sales" in conversation.prompt.lower():
-        conversation_type = "sales"
-    elif "appointment" in conversation.prompt.lower():
-        conversation_type = "appointment"
-    
+    user_response = _DIGIT_RESPONSES.get(digits, "unclear response")
+
+    # Type was computed once at conversation creation
+    conversation_type = conversation.conversation_type
+
+
     # Generate AI response
     ai_response = await generate_ai_response(
         conversation_context=conversation.prompt,
@@ -429,8 +625,8 @@ async def handle_gather(conversation_id: str, Digits: str = Form("")):
     )
     
     # Use AI response or fallback to static responses
-    if ai_response and ai_response != "I'm here to help! How can I assist you today?":
-        response.say(ai_response, voice='alice')
+    if ai_response is not _AI_FALLBACK:
+        _say_sentences(response, ai_response)
     else:
         # Fallback to static responses if AI fails
         if conversation_type == "customer service":
@@ -495,33 +691,19 @@ async def handle_gather(conversation_id: str, Digits: str = Form("")):
 async def handle_followup(conversation_id: str, Digits: str = Form("")):
     """Handle follow-up conversation with AI responses"""
     if conversation_id not in conversations_db:
-        response = VoiceResponse()
-        response.say("Sorry, I couldn't find your conversation. Goodbye.", voice='alice')
-        response.hangup()
-        return Response(content=str(response), media_type="application/xml")
-    
+        return Response(content=_NOT_FOUND_TWIML, media_type="application/xml")
+
     conversation = conversations_db[conversation_id]
     digits = Digits
     response = VoiceResponse()
-    
+
     # Map digits to follow-up responses
-    followup_responses = {
-        "1": "continue conversation",
-        "2": "schedule follow-up", 
-        "3": "end call"
-    }
-    
-    user_response = followup_responses.get(digits, "unclear response")
-    
-    # Determine conversation type
-    conversation_type = "general"
-    if "customer service" in conversation.prompt.lower():
-        conversation_type = "customer service"
-    elif "sales" in conversation.prompt.lower():
-        conversation_type = "sales"
-    elif "appointment" in conversation.prompt.lower():
-        conversation_type = "appointment"
-    
+    user_response = _FOLLOWUP_RESPONSES.get(digits, "unclear response")
+
+    # Type was computed once at conversation creation
+    conversation_type = conversation.conversation_type
+
+
     # Generate AI response for follow-up
     ai_response = await generate_ai_response(
         conversation_context=f"Follow-up conversation. Original context: {conversation.prompt}",
@@ -531,8 +713,8 @@ async def handle_followup(conversation_id: str, Digits: str = Form("")):
     
     if digits == "1":
         # Use AI response or fallback
-        if ai_response and ai_response != "I'm here to help! How can I assist you today?":
-            response.say(ai_response, voice='alice')
+        if ai_response is not _AI_FALLBACK:
+            _say_sentences(response, ai_response)
         else:
             response.say("Great! Let's continue our discussion. What other questions do you have?", voice='alice')
         
@@ -548,15 +730,15 @@ async def handle_followup(conversation_id: str, Digits: str = Form("")):
         response.hangup()
         
     elif digits == "2":
-        if ai_response and ai_response != "I'm here to help! How can I assist you today?":
-            response.say(ai_response, voice='alice')
+        if ai_response is not _AI_FALLBACK:
+            _say_sentences(response, ai_response)
         else:
             response.say("Perfect! I'll schedule a follow-up call for next week. Thank you for your time!", voice='alice')
         response.hangup()
         
     elif digits == "3":
-        if ai_response and ai_response != "I'm here to help! How can I assist you today?":
-            response.say(ai_response, voice='alice')
+        if ai_response is not _AI_FALLBACK:
+            _say_sentences(response, ai_response)
         else:
             response.say("Thank you for your time today. Have a great day! Goodbye!", voice='alice')
         response.hangup()
@@ -590,19 +772,16 @@ async def conversation_webhook(request: dict):
     call_status = request.get("CallStatus")
     call_duration = request.get("CallDuration")
     
-    # Find conversation by call_sid
-    conversation = None
-    for conv in conversations_db.values():
-        if conv.call_sid == call_sid:
-            conversation = conv
-            break
-    
+    # Find conversation by call_sid via the secondary index
+    conv_id = call_sid_index.get(call_sid)
+    conversation = conversations_db.get(conv_id) if conv_id else None
+
+
     if conversation:
         conversation.status = call_status
         if call_duration:
             conversation.duration = int(call_duration)
-        conversations_db[conversation.id] = conversation
-        
+
         print(f"Updated conversation {conversation.id}: {call_status}")
     
     return {"message": "Webhook received"}
@@ -614,16 +793,18 @@ async def delete_conversation(conversation_id: str):
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     deleted_conversation = conversations_db.pop(conversation_id)
+    if deleted_conversation.call_sid:
+        call_sid_index.pop(deleted_conversation.call_sid, None)
     return {"message": f"Conversation {conversation_id} deleted", "conversation": deleted_conversation}
 
 # Workflow endpoints
 @app.post("/workflows", response_model=dict)
-async def save_workflow(workflow: dict):
+async def save_workflow(workflow: dict, ts: str = Depends(now_iso)):
     """Save a workflow"""
     try:
-        workflow_id = workflow.get("id") or str(uuid.uuid4())
+        workflow_id = workflow.get("id") or _uuid_pool.next()
         workflow["id"] = workflow_id
-        workflow["updated_at"] = datetime.now().isoformat()
+        workflow["updated_at"] = ts
         
         workflows_db[workflow_id] = workflow
         print(f"[workflow] Saved workflow: {workflow.get('name', 'Untitled')} (ID: {workflow_id})")
@@ -650,17 +831,17 @@ async def get_workflow(workflow_id: str):
     return workflows_db[workflow_id]
 
 @app.post("/workflows/execute", response_model=dict)
-async def execute_workflow(request: WorkflowExecuteRequest):
+async def execute_workflow(request: WorkflowExecuteRequest, ts: str = Depends(now_iso)):
     """Execute a workflow"""
     try:
-        execution_id = str(uuid.uuid4())
+        execution_id = _uuid_pool.next()
         execution_data = {
             "id": execution_id,
             "workflow_id": request.workflow_id,
             "workflow_data": request.workflow_data,
             "phone_number": request.phone_number,
             "status": "pending",
-            "created_at": datetime.now().isoformat(),
+            "created_at": ts,
             "logs": []
         }
         
@@ -682,7 +863,7 @@ async def execute_workflow(request: WorkflowExecuteRequest):
         # Simulate execution
         execution_data["status"] = "running"
         execution_data["logs"].append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": ts,
             "message": f"Workflow execution started with {len(nodes)} nodes",
             "node_id": start_nodes[0].get("id", "unknown")
         })
@@ -690,9 +871,9 @@ async def execute_workflow(request: WorkflowExecuteRequest):
         # For now, just mark as completed
         # In a real implementation, this would execute the actual workflow steps
         execution_data["status"] = "completed"
-        execution_data["completed_at"] = datetime.now().isoformat()
+        execution_data["completed_at"] = ts
         execution_data["logs"].append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": ts,
             "message": "Workflow execution completed successfully",
             "node_id": "workflow"
         })
@@ -720,4 +901,14 @@ async def get_workflow_execution(execution_id: str):
     return workflow_executions_db[execution_id]
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools beat the default asyncio/h11 stack by 2-3x on the
+    # small-JSON endpoints; fall back to uvicorn's auto-detection if either
+    # is missing. Kept at one worker: conversation state is process-local
+    # (see the conversations_db note above).
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "auto", "auto"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http=http)
\ No newline at end of file